@@ -5,7 +5,12 @@ class IsAdmin(permissions.BasePermission):
     Allow access only to admin users.
     """
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'admin'
+        # Cached on the request: DRF may evaluate has_permission more than once per request
+        cached = getattr(request, '_is_admin', None)
+        if cached is None:
+            cached = request.user.is_authenticated and getattr(request.user, 'role', None) == 'admin'
+            request._is_admin = cached
+        return cached
 
 
 class IsUser(permissions.BasePermission):
@@ -13,7 +18,11 @@ class IsUser(permissions.BasePermission):
     Allow access only to regular users.
     """
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'user'
+        cached = getattr(request, '_is_user', None)
+        if cached is None:
+            cached = request.user.is_authenticated and getattr(request.user, 'role', None) == 'user'
+            request._is_user = cached
+        return cached
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
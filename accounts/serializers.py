@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from .models import User
-import re
+from .utils import username_cache_key, USERNAME_CACHE_TIMEOUT
+import string
 from django.contrib.auth.password_validation import validate_password
+from django.core.cache import cache
+
+_USERNAME_ALLOWED = frozenset(string.ascii_lowercase + string.digits + '_@.')
 
 class SendOTPSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -24,12 +28,18 @@ class SetCredentialsSerializer(serializers.Serializer):
         if len(value) < 6:
             raise serializers.ValidationError("Username must be at least 6 characters long.")
 
-        if not re.match(r'^[a-z0-9_@.]+$', value):
+        if not _USERNAME_ALLOWED.issuperset(value):
             raise serializers.ValidationError(
                 "Username can contain only lowercase letters, numbers, '_', '.' and '@'. No spaces allowed."
             )
 
-        if User.objects.filter(username=value).exists():
+        # Short-lived cache in front of the uniqueness probe; the view re-checks before saving
+        key = username_cache_key(value)
+        taken = cache.get(key)
+        if taken is None:
+            taken = User.objects.filter(username=value).exists()
+            cache.set(key, taken, USERNAME_CACHE_TIMEOUT)
+        if taken:
             raise serializers.ValidationError("Username already taken.")
 
         return value
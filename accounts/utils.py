@@ -186,4 +186,13 @@ def get_apple_user_info(access_token):
         
     except Exception as e:
         logger.error(f"Error decoding Apple token: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+
+USERNAME_CACHE_TIMEOUT = 30
+USERNAME_TAKEN_CACHE_TIMEOUT = 300
+
+
+def username_cache_key(username):
+    """Cache key for the username availability lookup"""
+    return f"uname:{username}"
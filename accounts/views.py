@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework import viewsets, permissions, status
 from django.core.mail import send_mail
 from django.conf import settings
+from django.core.cache import cache
 import random
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -124,6 +125,7 @@ class SetCredentialsView(APIView):
         user.set_password(password)
         user.username_set = True
         user.save()
+        cache.set(username_cache_key(username), True, USERNAME_TAKEN_CACHE_TIMEOUT)
 
         return Response({"message": "Credentials set successfully. You can now log in."}, status=201)
 
@@ -198,6 +198,31 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Cached lists and lookups are invalidated by model signals, which only reach
+# every worker through a shared cache. Set REDIS_URL in production: without it
+# each process gets its own LocMemCache, an admin edit is only seen by the
+# worker that handled it, and SHARED_CACHE = False makes those entries
+# short-lived instead (see product/utils.py).
+
+SHARED_CACHE = bool(os.getenv('REDIS_URL'))
+
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # CORS_ALLOWED_ORIGINS = [
 #        "http://localhost:3000",
@@ -6,10 +6,43 @@ from django.utils.safestring import mark_safe
 from .models import *
 
 admin.site.register(PhoneBrand)
-admin.site.register(PhoneModel)
 admin.site.register(PhoneProblem)
-admin.site.register(RepairPrice)
-admin.site.register(Order)
-admin.site.register(OrderItem)
 admin.site.register(WebsiteDiscount)
 
+
+@admin.register(PhoneModel)
+class PhoneModelAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'release_year', 'is_active')
+    list_select_related = ('brand',)
+    list_filter = ('brand', 'is_active')
+
+
+@admin.register(RepairPrice)
+class RepairPriceAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'base_price', 'discount_percentage', 'discount_amount', 'in_stock', 'is_active')
+    list_select_related = ('phone_model__brand', 'problem')
+    list_filter = ('part_type', 'in_stock', 'is_active')
+    raw_id_fields = ('phone_model', 'problem')
+    list_per_page = 50
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = (
+        'order_number', 'customer_name', 'user', 'phone_model',
+        'total_amount', 'status', 'payment_status', 'created_at'
+    )
+    list_select_related = ('phone_model__brand', 'user')
+    list_filter = ('status', 'payment_status')
+    search_fields = ('order_number', 'customer_name', 'customer_email', 'customer_phone')
+    raw_id_fields = ('user', 'phone_model')
+    list_per_page = 50
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'part_type', 'final_price', 'is_completed')
+    list_select_related = ('order', 'problem')
+    list_filter = ('part_type', 'is_completed')
+    raw_id_fields = ('order', 'problem')
+    list_per_page = 50
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def shared_cache_check(app_configs, **kwargs):
+    if settings.SHARED_CACHE:
+        return []
+    return [
+        Warning(
+            "REDIS_URL is not set; falling back to a per-process LocMemCache.",
+            hint="Signal-based cache invalidation only reaches the worker that made the "
+                 "change, so cached lists use short timeouts. Set REDIS_URL in production.",
+            id='product.W001',
+        )
+    ]
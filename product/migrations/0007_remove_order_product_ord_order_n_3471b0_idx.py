@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0006_websitediscount'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='product_ord_order_n_3471b0_idx',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+
+def populate_phone_model_display(apps, schema_editor):
+    Order = apps.get_model('product', 'Order')
+    PhoneModel = apps.get_model('product', 'PhoneModel')
+    display = PhoneModel.objects.filter(pk=OuterRef('phone_model_id')).annotate(
+        display=Concat('brand__name', Value(' '), 'name')
+    ).values('display')[:1]
+    Order.objects.update(phone_model_display=Subquery(display))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0007_remove_order_product_ord_order_n_3471b0_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='phone_model_display',
+            field=models.CharField(default='', editable=False, help_text='Brand and model name at order time, denormalized for order lists', max_length=300),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_phone_model_display, migrations.RunPython.noop),
+    ]
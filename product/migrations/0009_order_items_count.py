@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:25
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_items_count(apps, schema_editor):
+    Order = apps.get_model('product', 'Order')
+    OrderItem = apps.get_model('product', 'OrderItem')
+    counts = OrderItem.objects.filter(order=OuterRef('pk')).values('order').annotate(
+        count=Count('pk')
+    ).values('count')
+    Order.objects.update(items_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0008_order_phone_model_display'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='items_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of order items, maintained by OrderItem signals'),
+        ),
+        migrations.RunPython(populate_items_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0009_order_items_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repairprice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['phone_model', 'problem', 'part_type'], name='rp_active_idx'),
+        ),
+    ]
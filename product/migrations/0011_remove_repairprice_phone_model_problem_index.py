@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0010_repairprice_rp_active_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='repairprice',
+            name='product_rep_phone_m_913a63_idx',
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Greatest
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth import get_user_model
 from decimal import Decimal
@@ -6,6 +8,11 @@ import uuid
 
 User = get_user_model()
 
+# Shared Decimal constants for price arithmetic (avoids re-parsing literals per call)
+DECIMAL_ZERO = Decimal('0.00')
+DECIMAL_HUNDRED = Decimal('100')
+DECIMAL_CENT = Decimal('0.01')
+
 
 class PhoneBrand(models.Model):
     """Phone brand model (e.g., Apple, Samsung)"""
@@ -123,8 +130,13 @@ class RepairPrice(models.Model):
         verbose_name = 'Repair Price'
         verbose_name_plural = 'Repair Prices'
         indexes = [
-            models.Index(fields=['phone_model', 'problem']),
             models.Index(fields=['part_type', 'is_active']),
+            # Active-price lookups by (phone_model, problem, part_type) in order validation/pricing
+            models.Index(
+                fields=['phone_model', 'problem', 'part_type'],
+                condition=Q(is_active=True),
+                name='rp_active_idx'
+            ),
         ]
 
     def __str__(self):
@@ -135,9 +147,9 @@ class RepairPrice(models.Model):
         """Calculate final price after discounts"""
         price = self.base_price
         if self.discount_percentage > 0:
-            price -= (price * self.discount_percentage / Decimal('100'))
+            price -= (price * self.discount_percentage / DECIMAL_HUNDRED)
         price -= self.discount_amount
-        return max(price, Decimal('0.00'))
+        return max(price, DECIMAL_ZERO)
 
     @property
     def total_discount(self):
@@ -145,6 +157,21 @@ class RepairPrice(models.Model):
         return self.base_price - self.final_price
 
 
+# SQL equivalents of RepairPrice.final_price / total_discount, annotated as
+# final_price_db / total_discount_db (the properties stay the source of truth on instances)
+FINAL_PRICE_EXPRESSION = ExpressionWrapper(
+    Greatest(
+        F('base_price') - F('base_price') * F('discount_percentage') / Value(DECIMAL_HUNDRED) - F('discount_amount'),
+        Value(DECIMAL_ZERO)
+    ),
+    output_field=models.DecimalField(max_digits=10, decimal_places=2)
+)
+TOTAL_DISCOUNT_EXPRESSION = ExpressionWrapper(
+    F('base_price') - FINAL_PRICE_EXPRESSION,
+    output_field=models.DecimalField(max_digits=10, decimal_places=2)
+)
+
+
 class Order(models.Model):
     """Customer order for phone repair"""
     STATUS_CHOICES = [
@@ -174,6 +201,11 @@ class Order(models.Model):
     
     # Phone information
     phone_model = models.ForeignKey(PhoneModel, on_delete=models.PROTECT, related_name='orders')
+    phone_model_display = models.CharField(
+        max_length=300,
+        editable=False,
+        help_text="Brand and model name at order time, denormalized for order lists"
+    )
     
     # Pricing
     subtotal = models.DecimalField(
@@ -208,6 +240,11 @@ class Order(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(Decimal('0.00'))]
     )
+    items_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of order items, maintained by OrderItem signals"
+    )
     
     # Status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -232,7 +269,6 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         indexes = [
-            models.Index(fields=['order_number']),
             models.Index(fields=['status', 'payment_status']),
             models.Index(fields=['-created_at']),
         ]
@@ -243,36 +279,57 @@ class Order(models.Model):
     def save(self, *args, **kwargs):
         if not self.order_number:
             self.order_number = self.generate_order_number()
+        # Snapshot the phone model name on creation, and again only if the order
+        # is moved to another phone model; later renames don't rewrite it
+        loaded_phone_model_id = getattr(self, '_loaded_phone_model_id', None)
+        if not self.phone_model_display or (
+            loaded_phone_model_id is not None and loaded_phone_model_id != self.phone_model_id
+        ):
+            self.phone_model_display = str(self.phone_model)
         super().save(*args, **kwargs)
+        self._loaded_phone_model_id = self.phone_model_id
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_phone_model_id = instance.__dict__.get('phone_model_id')
+        return instance
 
     @staticmethod
     def generate_order_number():
-        """Generate unique order number"""
-        while True:
-            order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
-            if not Order.objects.filter(order_number=order_number).exists():
-                return order_number
+        """Generate order number (uniqueness is enforced by the database)"""
+        return f"ORD-{uuid.uuid4().hex[:12].upper()}"
 
     def calculate_totals(self):
         """Calculate all totals for the order"""
         # Calculate subtotal and item discounts from order items
-        items = self.order_items.all()
-        self.subtotal = sum(item.base_price for item in items)
-        self.item_discount = sum(item.item_discount for item in items)
+        totals = self.order_items.aggregate(
+            subtotal=Sum('base_price'),
+            item_discount=Sum(
+                F('base_price') - F('final_price'),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            )
+        )
+        return self.apply_totals(totals['subtotal'] or DECIMAL_ZERO, totals['item_discount'] or DECIMAL_ZERO)
+
+    def apply_totals(self, subtotal, item_discount):
+        """Set item totals and derive the website discount and final total"""
+        self.subtotal = subtotal
+        self.item_discount = item_discount
         
         # Calculate price after item discounts
         price_after_items = self.subtotal - self.item_discount
         
         # Apply website percentage discount
-        website_discount = Decimal('0.00')
+        website_discount = DECIMAL_ZERO
         if self.website_discount_percentage > 0:
-            website_discount = price_after_items * (self.website_discount_percentage / Decimal('100'))
+            website_discount = price_after_items * (self.website_discount_percentage / DECIMAL_HUNDRED)
         
         # Apply website fixed discount
         website_discount += self.website_discount_amount
         
         # Calculate final total
-        self.total_amount = max(price_after_items - website_discount, Decimal('0.00'))
+        self.total_amount = max(price_after_items - website_discount, DECIMAL_ZERO)
         
         return self.total_amount
 
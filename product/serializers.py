@@ -1,6 +1,38 @@
 from rest_framework import serializers
 from .models import *
+from .utils import get_repair_price_lookup
 from decimal import Decimal
+import copy
+
+
+class CachedFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that builds its fields once per class and gives each
+    instance a deep copy, skipping model introspection on every instantiation.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        fields = self._fields_cache.get(type(self))
+        if fields is None:
+            fields = self._fields_cache[type(self)] = super().get_fields()
+        return copy.deepcopy(fields)
+
+
+class AnnotatedDecimalField(serializers.DecimalField):
+    """
+    Read-only DecimalField that prefers a queryset annotation (`source`) and
+    falls back to the model property `fallback` on instances loaded without it.
+    """
+    def __init__(self, fallback, **kwargs):
+        self.fallback = fallback
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if self.source in instance.__dict__:
+            return instance.__dict__[self.source]
+        return getattr(instance, self.fallback)
 
 
 class PhoneBrandSerializer(serializers.ModelSerializer):
@@ -10,7 +42,7 @@ class PhoneBrandSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'logo', 'is_active', 'created_at']
         read_only_fields = ['is_active']
 
-class PhoneModelListSerializer(serializers.ModelSerializer):
+class PhoneModelListSerializer(CachedFieldsModelSerializer):
     """Serializer for phone model list"""
     brand_name = serializers.CharField(source='brand.name', read_only=True)
     
@@ -26,15 +58,12 @@ class PhoneModelDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for phone model with available repairs"""
     brand_name = serializers.CharField(source='brand.name', read_only=True)
     brand_logo = serializers.ImageField(source='brand.logo', read_only=True)
-    available_repairs_count = serializers.SerializerMethodField()
+    available_repairs_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = PhoneModel
         fields = ['id', 'name', 'brand', 'brand_name', 'brand_logo', 'image', 
                   'is_active', 'available_repairs_count']
-    
-    def get_available_repairs_count(self, obj):
-        return obj.repair_prices.filter(is_active=True).values('problem').distinct().count()
 
 
 class PhoneProblemSerializer(serializers.ModelSerializer):
@@ -45,14 +74,18 @@ class PhoneProblemSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'icon', 'estimated_time']
 
 
-class RepairPriceSerializer(serializers.ModelSerializer):
+class RepairPriceSerializer(CachedFieldsModelSerializer):
     """Serializer for repair prices with calculated fields"""
     problem_name = serializers.CharField(source='problem.name', read_only=True)
     problem_icon = serializers.CharField(source='problem.icon', read_only=True)
     problem_description = serializers.CharField(source='problem.description', read_only=True)
     estimated_time = serializers.IntegerField(source='problem.estimated_time', read_only=True)
-    final_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
-    total_discount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    final_price = AnnotatedDecimalField(
+        'final_price', max_digits=10, decimal_places=2, source='final_price_db'
+    )
+    total_discount = AnnotatedDecimalField(
+        'total_discount', max_digits=10, decimal_places=2, source='total_discount_db'
+    )
     
     class Meta:
         model = RepairPrice
@@ -82,7 +115,7 @@ class OrderItemCreateSerializer(serializers.Serializer):
     part_type = serializers.ChoiceField(choices=RepairPrice.PART_TYPE_CHOICES, default='original')
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(CachedFieldsModelSerializer):
     """Serializer for order items"""
     problem_name = serializers.CharField(source='problem.name', read_only=True)
     problem_icon = serializers.CharField(source='problem.icon', read_only=True)
@@ -100,7 +133,11 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 class OrderCreateSerializer(serializers.Serializer):
     """Serializer for creating orders"""
-    phone_model_id = serializers.IntegerField()
+    phone_model_id = serializers.PrimaryKeyRelatedField(
+        queryset=PhoneModel.objects.filter(is_active=True).select_related('brand'),
+        source='phone_model',
+        error_messages={'does_not_exist': 'Invalid or inactive phone model'}
+    )
     customer_name = serializers.CharField(max_length=200)
     customer_email = serializers.EmailField()
     customer_phone = serializers.CharField(max_length=20)
@@ -126,31 +163,28 @@ class OrderCreateSerializer(serializers.Serializer):
         return value
 
     def validate(self, data):
-        # Validate phone model exists
-        phone_model_id = data.get('phone_model_id')
-        try:
-            phone_model = PhoneModel.objects.get(id=phone_model_id, is_active=True)
-        except PhoneModel.DoesNotExist:
-            raise serializers.ValidationError({"phone_model_id": "Invalid or inactive phone model"})
-
-        # Validate repair prices exist for all items
-        for item in data.get('items', []):
-            try:
-                repair_price = RepairPrice.objects.get(
-                    phone_model=phone_model,
-                    problem_id=item['problem_id'],
-                    part_type=item['part_type'],
-                    is_active=True
-                )
-                if not repair_price.in_stock:
-                    raise serializers.ValidationError({
-                        "items": f"Part not in stock for {repair_price.problem.name} ({item['part_type']})"
-                    })
-            except RepairPrice.DoesNotExist:
+        # The phone model is resolved (and checked active) by phone_model_id
+        phone_model = data['phone_model']
+
+        # Validate repair prices exist for all items (single query)
+        items = data.get('items', [])
+        by_key = get_repair_price_lookup(
+            phone_model, [(item['problem_id'], item['part_type']) for item in items]
+        )
+
+        for item in items:
+            repair_price = by_key.get((item['problem_id'], item['part_type']))
+            if repair_price is None:
                 raise serializers.ValidationError({
                     "items": f"Invalid repair option for problem ID {item['problem_id']} with part type {item['part_type']}"
                 })
+            if not repair_price.in_stock:
+                raise serializers.ValidationError({
+                    "items": f"Part not in stock for {repair_price.problem.name} ({item['part_type']})"
+                })
 
+        # Hand the loaded prices to the view so it doesn't fetch them again
+        data['repair_prices'] = by_key
         return data
 
 
@@ -182,9 +216,9 @@ class OrderSerializer(serializers.ModelSerializer):
 
 class OrderListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for order list"""
-    phone_model_name = serializers.CharField(source='phone_model.__str__', read_only=True)
+    phone_model_name = serializers.CharField(source='phone_model_display', read_only=True)
     brand_name = serializers.CharField(source='phone_model.brand.name', read_only=True)
-    items_count = serializers.SerializerMethodField()
+    items_count = serializers.IntegerField(read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     payment_status_display = serializers.CharField(source='get_payment_status_display', read_only=True)
     
@@ -196,9 +230,6 @@ class OrderListSerializer(serializers.ModelSerializer):
             'status_display', 'payment_status', 'payment_status_display',
             'items_count', 'created_at'
         ]
-    
-    def get_items_count(self, obj):
-        return obj.order_items.count()
 
 
 class PriceCalculationSerializer(serializers.Serializer):
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Order, OrderItem, PhoneBrand, PhoneModel, PhoneProblem, RepairPrice, WebsiteDiscount
+from .utils import WEBSITE_DISCOUNT_CACHE_KEY, invalidate_repair_prices_cache, table_etag_cache_key
+
+
+@receiver(post_save, sender=WebsiteDiscount)
+@receiver(post_delete, sender=WebsiteDiscount)
+def invalidate_website_discount(sender, **kwargs):
+    # Cached lists are keyed by ETag, so dropping the ETag retires them too
+    cache.delete_many([WEBSITE_DISCOUNT_CACHE_KEY, table_etag_cache_key(WebsiteDiscount)])
+
+
+@receiver(post_save, sender=PhoneBrand)
+@receiver(post_delete, sender=PhoneBrand)
+def invalidate_phone_brand_list(sender, **kwargs):
+    cache.delete(table_etag_cache_key(PhoneBrand))
+
+
+@receiver(post_save, sender=PhoneProblem)
+@receiver(post_delete, sender=PhoneProblem)
+def invalidate_phone_problem_list(sender, **kwargs):
+    cache.delete(table_etag_cache_key(PhoneProblem))
+
+
+@receiver(post_save, sender=RepairPrice)
+@receiver(post_delete, sender=RepairPrice)
+@receiver(post_save, sender=PhoneProblem)
+@receiver(post_delete, sender=PhoneProblem)
+@receiver(post_save, sender=PhoneModel)
+@receiver(post_delete, sender=PhoneModel)
+def invalidate_repair_prices(sender, **kwargs):
+    invalidate_repair_prices_cache()
+
+
+@receiver(post_save, sender=OrderItem)
+def increment_order_items_count(sender, instance, created, **kwargs):
+    if created:
+        Order.objects.filter(pk=instance.order_id).update(items_count=F('items_count') + 1)
+
+
+@receiver(post_delete, sender=OrderItem)
+def decrement_order_items_count(sender, instance, **kwargs):
+    Order.objects.filter(pk=instance.order_id).update(items_count=F('items_count') - 1)
@@ -0,0 +1,137 @@
+import hashlib
+import time
+from decimal import ROUND_HALF_UP
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Q
+from .models import DECIMAL_CENT, FINAL_PRICE_EXPRESSION, RepairPrice, WebsiteDiscount
+
+# Signal invalidation only reaches other workers through a shared cache; with
+# the per-process fallback, signal-invalidated entries expire quickly instead
+SIGNAL_INVALIDATED_CACHE_TIMEOUT = 300 if settings.SHARED_CACHE else 30
+
+WEBSITE_DISCOUNT_CACHE_KEY = 'website_discount:active'
+WEBSITE_DISCOUNT_CACHE_TIMEOUT = 600 if settings.SHARED_CACHE else 60
+TABLE_ETAG_CACHE_TIMEOUT = 10
+REPAIR_PRICES_STATE_CACHE_TIMEOUT = 10
+REPAIR_PRICES_LIST_CACHE_TIMEOUT = SIGNAL_INVALIDATED_CACHE_TIMEOUT
+REPAIR_PRICES_GENERATION_KEY = 'repair:generation'
+PHONE_BRAND_LIST_CACHE_KEY = 'phonebrand:list:v1'
+PHONE_PROBLEM_LIST_CACHE_KEY = 'phoneproblem:list:v1'
+WEBSITE_DISCOUNT_LIST_CACHE_KEY = 'website_discount:list:v1'
+LIST_CACHE_TIMEOUT = SIGNAL_INVALIDATED_CACHE_TIMEOUT
+
+
+def round_money(value):
+    """Round a Decimal amount to cents the way order prices are stored (half up)."""
+    return value.quantize(DECIMAL_CENT, rounding=ROUND_HALF_UP)
+
+
+def get_active_website_discount():
+    """
+    Return the active website discount (or None), cached since it rarely changes.
+    Invalidated by the WebsiteDiscount signal handlers.
+    """
+    return cache.get_or_set(
+        WEBSITE_DISCOUNT_CACHE_KEY,
+        lambda: WebsiteDiscount.objects.filter(is_active=True).first(),
+        WEBSITE_DISCOUNT_CACHE_TIMEOUT
+    )
+
+
+def table_etag_cache_key(*models):
+    return 'etag:' + ','.join(model._meta.label_lower for model in models)
+
+
+def get_table_etag(*models):
+    """
+    ETag for the current contents of the given tables, built from max(updated_at)
+    and row count of each. Cached briefly so repeat requests skip the aggregates.
+    """
+    cache_key = table_etag_cache_key(*models)
+    etag = cache.get(cache_key)
+    if etag is None:
+        state = [
+            model.objects.aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+            for model in models
+        ]
+        digest = hashlib.md5(
+            ';'.join(f"{row['last_modified']}:{row['count']}" for row in state).encode()
+        ).hexdigest()
+        etag = f'"{digest}"'
+        cache.set(cache_key, etag, TABLE_ETAG_CACHE_TIMEOUT)
+    return etag
+
+
+def invalidate_repair_prices_cache():
+    """
+    Drop every cached repair price list and state by starting a new key
+    generation; old entries are never read again and expire on their own.
+    """
+    cache.set(REPAIR_PRICES_GENERATION_KEY, time.time_ns(), None)
+
+
+def repair_prices_cache_key(prefix, phone_model_id=None, brand_id=None):
+    generation = cache.get_or_set(REPAIR_PRICES_GENERATION_KEY, time.time_ns, None)
+    if phone_model_id:
+        scope = f'pm={phone_model_id}'
+    elif brand_id:
+        scope = f'brand={brand_id}'
+    else:
+        scope = 'all'
+    return f'repair:{prefix}:{generation}:{scope}'
+
+
+def get_repair_prices_state(phone_model_id=None, brand_id=None):
+    """
+    Last modification times and row count of the active repair prices for a
+    phone model (or brand), used for conditional GETs. Cached briefly.
+    """
+    if phone_model_id:
+        filters = {'phone_model_id': phone_model_id}
+    elif brand_id:
+        filters = {'phone_model__brand_id': brand_id}
+    else:
+        filters = {}
+
+    cache_key = repair_prices_cache_key('state', phone_model_id, brand_id)
+    state = cache.get(cache_key)
+    if state is None:
+        state = RepairPrice.objects.filter(is_active=True, **filters).aggregate(
+            last_modified=Max('updated_at'),
+            problem_last_modified=Max('problem__updated_at'),
+            count=Count('pk')
+        )
+        cache.set(cache_key, state, REPAIR_PRICES_STATE_CACHE_TIMEOUT)
+    return state
+
+
+def _active_repair_prices_for_pairs(phone_model, pairs):
+    query = Q()
+    for problem_id, part_type in set(pairs):
+        query |= Q(problem_id=problem_id, part_type=part_type)
+    if not query:
+        return RepairPrice.objects.none()
+    return RepairPrice.objects.filter(phone_model=phone_model, is_active=True).filter(query)
+
+
+def get_repair_price_lookup(phone_model, pairs):
+    """
+    Active repair prices of `phone_model` for the given (problem_id, part_type)
+    pairs, loaded in a single query and keyed by pair.
+    """
+    rows = _active_repair_prices_for_pairs(phone_model, pairs).select_related('problem')
+    return {(row.problem_id, row.part_type): row for row in rows}
+
+
+def get_repair_price_quotes(phone_model, pairs):
+    """
+    Like get_repair_price_lookup, but returns plain dicts with the final price
+    computed in SQL, for read-only pricing that needs no model instances.
+    """
+    rows = _active_repair_prices_for_pairs(phone_model, pairs).order_by().values(
+        'problem_id', 'part_type', 'base_price', 'warranty_days',
+        problem_name=F('problem__name'),
+        final_price=FINAL_PRICE_EXPRESSION
+    )
+    return {(row['problem_id'], row['part_type']): row for row in rows}
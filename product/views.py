@@ -2,39 +2,82 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Prefetch, Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from decimal import Decimal
+from itertools import groupby
 from .models import *
 from .serializers import *
+from .utils import (
+    LIST_CACHE_TIMEOUT, PHONE_BRAND_LIST_CACHE_KEY, PHONE_PROBLEM_LIST_CACHE_KEY,
+    REPAIR_PRICES_LIST_CACHE_TIMEOUT, WEBSITE_DISCOUNT_LIST_CACHE_KEY,
+    get_active_website_discount, get_repair_price_quotes, get_repair_prices_state, get_table_etag,
+    repair_prices_cache_key, round_money
+)
 
 
-class PhoneBrandViewSet(viewsets.ModelViewSet):
+class ListETagMixin:
+    """
+    Conditional GET for list endpoints over rarely-changing tables.
+    Responds 304 Not Modified when If-None-Match matches the ETag of `etag_models`.
+    When `list_cache_key` is set the serialized list is also cached under the
+    ETag it was served with, so a cached body is never paired with a newer ETag,
+    and under the request's scheme and host, which file/image URLs are built from.
+    """
+    etag_models = ()
+    list_cache_key = None
+
+    def list(self, request, *args, **kwargs):
+        etag = get_table_etag(*self.etag_models)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            cache_key = (
+                f"{self.list_cache_key}:{etag}:{request.build_absolute_uri('/')}"
+                if self.list_cache_key else None
+            )
+            data = cache.get(cache_key) if cache_key else None
+            if data is None:
+                response = super().list(request, *args, **kwargs)
+                if cache_key:
+                    cache.set(cache_key, list(response.data), LIST_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+        response['ETag'] = etag
+        return response
+
+
+class PhoneBrandViewSet(ListETagMixin, viewsets.ModelViewSet):
     queryset = PhoneBrand.objects.all()
     serializer_class = PhoneBrandSerializer
     permission_classes = [AllowAny]
+    etag_models = (PhoneBrand,)
+    list_cache_key = PHONE_BRAND_LIST_CACHE_KEY
 
     def get_queryset(self):
-        return PhoneBrand.objects.filter(is_active=True).prefetch_related('phone_models')
+        return PhoneBrand.objects.filter(is_active=True)
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        
-        return Response({
-            "status": "success",
-            "message": "Phone brands retrieved successfully",
-            "data": serializer.data
-        }, status=status.HTTP_200_OK)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response.data = {
+                "status": "success",
+                "message": "Phone brands retrieved successfully",
+                "data": response.data
+            }
+        return response
 
 
-class PhoneModelViewSet(viewsets.ModelViewSet):
+class PhoneModelViewSet(ListETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for phone models
     - List models (optionally filtered by brand)
     - Retrieve single model details
     """
     permission_classes = [AllowAny]
+    etag_models = (PhoneModel, PhoneBrand)
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -43,31 +86,45 @@ class PhoneModelViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         queryset = PhoneModel.objects.filter(is_active=True).select_related('brand')
+        if self.action == 'list':
+            queryset = queryset.only('id', 'name', 'brand', 'brand__name', 'image', 'is_active')
+        elif self.action == 'retrieve':
+            queryset = queryset.annotate(
+                available_repairs_count=Count(
+                    'repair_prices__problem',
+                    filter=Q(repair_prices__is_active=True),
+                    distinct=True
+                )
+            )
         
         brand_id = self.request.query_params.get('brand', None)
         if brand_id:
             queryset = queryset.filter(brand_id=brand_id)
         return queryset
     
-class DiscountViewSet(viewsets.ModelViewSet):
+class DiscountViewSet(ListETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for website discounts
     - List all active discounts
     """
     serializer_class = WebsiteDiscountSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    etag_models = (WebsiteDiscount,)
+    list_cache_key = WEBSITE_DISCOUNT_LIST_CACHE_KEY
 
     def get_queryset(self):
         return WebsiteDiscount.objects.filter(is_active=True)
 
 
-class PhoneProblemViewSet(viewsets.ModelViewSet):
+class PhoneProblemViewSet(ListETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for phone problems/repair types
     - List all active problems
     """
     serializer_class = PhoneProblemSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    etag_models = (PhoneProblem,)
+    list_cache_key = PHONE_PROBLEM_LIST_CACHE_KEY
 
     def get_queryset(self):
         return PhoneProblem.objects.filter(is_active=True)
@@ -83,7 +140,21 @@ class RepairPriceViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        return RepairPrice.objects.filter(is_active=True).select_related('phone_model', 'problem')
+        # RepairPriceSerializer renders phone_model as its pk only, so the phone
+        # model (and its brand) is never joined for output
+        queryset = RepairPrice.objects.filter(is_active=True).select_related('problem').annotate(
+            final_price_db=FINAL_PRICE_EXPRESSION,
+            total_discount_db=TOTAL_DISCOUNT_EXPRESSION
+        )
+        if self.action in ('list', 'retrieve'):
+            # Only the columns RepairPriceSerializer reads
+            queryset = queryset.only(
+                'id', 'phone_model', 'part_type', 'base_price', 'discount_percentage',
+                'discount_amount', 'in_stock', 'warranty_days', 'is_active',
+                'problem__id', 'problem__name', 'problem__icon', 'problem__description',
+                'problem__estimated_time'
+            )
+        return queryset
 
     def list(self, request, *args, **kwargs):
         """
@@ -95,6 +166,29 @@ class RepairPriceViewSet(viewsets.ModelViewSet):
         phone_model_id = request.query_params.get('phone_model')
         brand_id = request.query_params.get('brand')
 
+        # Conditional GET: prices change rarely, let clients revalidate cheaply
+        etag = last_modified = None
+        state = get_repair_prices_state(phone_model_id, brand_id)
+        if state['count']:
+            modified_at = max(state['last_modified'], state['problem_last_modified'])
+            etag = f'W/"{modified_at.timestamp()}-{state["count"]}"'
+            last_modified = int(modified_at.timestamp())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                response['ETag'] = etag
+                return response
+
+        # Formatted lists are cached per filter and per ETag, so a cached body is
+        # only served with the state it was built from; admins always read fresh
+        # data while editing prices
+        use_cache = etag is not None and not (
+            request.user.is_staff or getattr(request.user, 'role', None) == 'admin'
+        )
+        cache_key = f"{repair_prices_cache_key('list', phone_model_id, brand_id)}:{etag}"
+        data = cache.get(cache_key) if use_cache else None
+        if data is not None:
+            return self._grouped_response(data, etag, last_modified)
+
         queryset = self.get_queryset()
 
         if phone_model_id:
@@ -102,29 +196,50 @@ class RepairPriceViewSet(viewsets.ModelViewSet):
         elif brand_id:
             queryset = queryset.filter(phone_model__brand_id=brand_id)
 
-        if not queryset.exists():
+        # Rows of a problem must be adjacent for grouping. Across several phone
+        # models the oldest one's option is kept, as with the default ordering.
+        ordering = ['problem__name', 'problem_id', 'part_type']
+        if not phone_model_id:
+            ordering.append('-phone_model__created_at')
+        queryset = queryset.order_by(*ordering)
+
+        rows = list(queryset)
+        if not rows:
             return Response(
                 {"error": "No repair prices found for the given phone model or brand"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Group by problem
-        problems_dict = {}
-        for repair_price in queryset:
-            problem_id = repair_price.problem.id
-            if problem_id not in problems_dict:
-                problems_dict[problem_id] = {
-                    'problem_id': problem_id,
-                    'problem_name': repair_price.problem.name,
-                    'problem_icon': repair_price.problem.icon,
-                    'problem_description': repair_price.problem.description,
-                    'estimated_time': repair_price.problem.estimated_time,
-                    'original': None,
-                    'duplicate': None
-                }
-            problems_dict[problem_id][repair_price.part_type] = RepairPriceSerializer(repair_price).data
+        # Serialize all rows in one pass, then group by problem
+        serialized = self.get_serializer(rows, many=True).data
+        data = []
+        for _, group in groupby(zip(rows, serialized), key=lambda row: row[0].problem_id):
+            group = list(group)
+            problem = group[0][0].problem
+            problem_data = {
+                'problem_id': problem.id,
+                'problem_name': problem.name,
+                'problem_icon': problem.icon,
+                'problem_description': problem.description,
+                'estimated_time': problem.estimated_time,
+                'original': None,
+                'duplicate': None
+            }
+            problem_data.update(
+                (repair_price.part_type, repair_price_data) for repair_price, repair_price_data in group
+            )
+            data.append(problem_data)
+
+        if use_cache:
+            cache.set(cache_key, data, REPAIR_PRICES_LIST_CACHE_TIMEOUT)
+        return self._grouped_response(data, etag, last_modified)
 
-        return Response(list(problems_dict.values()), status=status.HTTP_200_OK)
+    def _grouped_response(self, data, etag, last_modified):
+        response = Response(data, status=status.HTTP_200_OK)
+        if etag:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
 
     @action(detail=False, methods=['post'])
     def calculate_price(self, request):
@@ -152,75 +267,82 @@ class RepairPriceViewSet(viewsets.ModelViewSet):
             return Response({"error": "items list is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            phone_model = PhoneModel.objects.get(id=phone_model_id, is_active=True)
+            phone_model = PhoneModel.objects.select_related('brand').get(id=phone_model_id, is_active=True)
         except PhoneModel.DoesNotExist:
             return Response({"error": "Invalid or inactive phone model"}, status=status.HTTP_400_BAD_REQUEST)
 
-        website_discount_obj = WebsiteDiscount.objects.filter(is_active=True).first()
-        website_discount_percentage = website_discount_obj.percentage if website_discount_obj else Decimal('0.00')
-        website_discount_amount = website_discount_obj.amount if website_discount_obj else Decimal('0.00')
-
-
-        # Calculate pricing
-        subtotal = Decimal('0.00')
-        item_discount = Decimal('0.00')
-        items_breakdown = []
-
-        for item_data in items_data:
-            problem_id = item_data.get('problem_id')
-            part_type = item_data.get('part_type', 'original')
-
-            try:
-                repair_price = RepairPrice.objects.select_related('problem').get(
-                    phone_model=phone_model,
-                    problem_id=problem_id,
-                    part_type=part_type,
-                    is_active=True
-                )
-                base_price = repair_price.base_price
-                final_price = repair_price.final_price
-                discount = base_price - final_price
+        items_serializer = OrderItemCreateSerializer(data=items_data, many=True)
+        if not items_serializer.is_valid():
+            return Response(
+                {"error": "Invalid items", "items": items_serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        pairs = [(item['problem_id'], item['part_type']) for item in items_serializer.validated_data]
 
-                subtotal += base_price
-                item_discount += discount
+        # Load every requested repair option in one query and reject the request
+        # if any of them is unavailable
+        lookup = get_repair_price_quotes(phone_model, pairs)
+        missing = [pair for pair in dict.fromkeys(pairs) if pair not in lookup]
+        if missing:
+            return Response(
+                {
+                    "error": "; ".join(
+                        f"Invalid repair option for problem ID {problem_id} with part type {part_type}"
+                        for problem_id, part_type in missing
+                    ),
+                    "missing": [
+                        {"problem_id": problem_id, "part_type": part_type}
+                        for problem_id, part_type in missing
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-                items_breakdown.append({
-                    'problem_id': problem_id,
-                    'problem_name': repair_price.problem.name,
-                    'part_type': part_type,
-                    'base_price': str(base_price),
-                    'discount': str(discount),
-                    'final_price': str(final_price),
-                    'warranty_days': repair_price.warranty_days
-                })
-
-            except RepairPrice.DoesNotExist:
-                return Response(
-                    {"error": f"Invalid repair option for problem ID {problem_id} with part type {part_type}"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        website_discount_obj = get_active_website_discount()
+        website_discount_percentage = website_discount_obj.percentage if website_discount_obj else DECIMAL_ZERO
+        website_discount_amount = website_discount_obj.amount if website_discount_obj else DECIMAL_ZERO
+
+
+        # Calculate pricing; totals come from the rows already loaded, one per
+        # requested item, so repeated items are counted each time. Item prices
+        # are rounded to cents like the order items create() stores.
+        selected = [(lookup[pair], round_money(lookup[pair]['final_price'])) for pair in pairs]
+        items_breakdown = [
+            {
+                'problem_id': repair_price['problem_id'],
+                'problem_name': repair_price['problem_name'],
+                'part_type': repair_price['part_type'],
+                'base_price': f"{repair_price['base_price']:.2f}",
+                'discount': f"{repair_price['base_price'] - final_price:.2f}",
+                'final_price': f"{final_price:.2f}",
+                'warranty_days': repair_price['warranty_days']
+            }
+            for repair_price, final_price in selected
+        ]
+        subtotal = sum((repair_price['base_price'] for repair_price, _ in selected), DECIMAL_ZERO)
+        item_discount = subtotal - sum((final_price for _, final_price in selected), DECIMAL_ZERO)
 
         # Price after item discounts
         price_after_items = subtotal - item_discount
 
         # Apply website discount
-        website_discount = (price_after_items * (website_discount_percentage / Decimal('100'))) + website_discount_amount
+        website_discount = (price_after_items * (website_discount_percentage / DECIMAL_HUNDRED)) + website_discount_amount
 
         # Final total
-        total_amount = max(price_after_items - website_discount, Decimal('0.00'))
+        total_amount = max(price_after_items - website_discount, DECIMAL_ZERO)
         total_discount = subtotal - total_amount
 
         return Response({
             'phone_model': phone_model.name,
             'brand': phone_model.brand.name,
-            'subtotal': str(subtotal),
-            'item_discount': str(item_discount),
-            'price_after_item_discount': str(price_after_items),
+            'subtotal': f"{subtotal:.2f}",
+            'item_discount': f"{item_discount:.2f}",
+            'price_after_item_discount': f"{price_after_items:.2f}",
             'website_discount_percentage': str(website_discount_percentage),
-            'website_discount_amount': str(website_discount_amount),
-            'website_discount': str(website_discount),
-            'total_amount': str(total_amount),
-            'total_discount': str(total_discount),
+            'website_discount_amount': f"{website_discount_amount:.2f}",
+            'website_discount': f"{round_money(website_discount):.2f}",
+            'total_amount': f"{round_money(total_amount):.2f}",
+            'total_discount': f"{round_money(total_discount):.2f}",
             'items': items_breakdown
         }, status=status.HTTP_200_OK)
 
@@ -242,11 +364,19 @@ class OrderViewSet(viewsets.ModelViewSet):
         return OrderSerializer
 
     def get_queryset(self):
-        queryset = Order.objects.select_related(
-            'phone_model', 'phone_model__brand', 'user'
-        ).prefetch_related(
-            Prefetch('order_items', queryset=OrderItem.objects.select_related('problem'))
-        )
+        queryset = Order.objects.select_related('phone_model__brand')
+        if self.action == 'list':
+            # Only the columns OrderListSerializer renders; it reads items_count
+            # rather than the items themselves
+            queryset = queryset.only(
+                'id', 'order_number', 'customer_name', 'customer_phone', 'phone_model_display',
+                'phone_model__brand__name', 'total_amount', 'status', 'payment_status',
+                'items_count', 'created_at'
+            )
+        else:
+            queryset = queryset.select_related('user').prefetch_related(
+                Prefetch('order_items', queryset=OrderItem.objects.select_related('problem'))
+            )
 
         # Filter by user if authenticated
         if self.request.user.is_authenticated and not self.request.user.is_staff:
@@ -286,54 +416,56 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         data = serializer.validated_data
-        phone_model = PhoneModel.objects.get(id=data['phone_model_id'])
+        phone_model = data['phone_model']
+        repair_prices = data['repair_prices']
 
-        # Create order
-        order = Order.objects.create(
+        order = Order(
             user=request.user if request.user.is_authenticated else None,
             customer_name=data['customer_name'],
             customer_email=data['customer_email'],
             customer_phone=data['customer_phone'],
             phone_model=phone_model,
-            subtotal=Decimal('0.00'),
-            item_discount=Decimal('0.00'),
-            website_discount_percentage=data.get('website_discount_percentage', Decimal('0.00')),
-            website_discount_amount=data.get('website_discount_amount', Decimal('0.00')),
-            total_amount=Decimal('0.00'),
+            website_discount_percentage=data.get('website_discount_percentage', DECIMAL_ZERO),
+            website_discount_amount=data.get('website_discount_amount', DECIMAL_ZERO),
+            # bulk_create below doesn't send post_save, so set the count here
+            items_count=len(data['items']),
             notes=data.get('notes', ''),
             status='pending',
             payment_status='pending'
         )
 
-        # Create order items
+        # Build order items from the repair prices loaded during validation
+        order_items = []
         for item_data in data['items']:
-            repair_price = RepairPrice.objects.select_related('problem').get(
-                phone_model=phone_model,
-                problem_id=item_data['problem_id'],
-                part_type=item_data['part_type'],
-                is_active=True
-            )
-
-            OrderItem.objects.create(
+            repair_price = repair_prices[(item_data['problem_id'], item_data['part_type'])]
+            order_items.append(OrderItem(
                 order=order,
                 problem=repair_price.problem,
                 part_type=item_data['part_type'],
                 base_price=repair_price.base_price,
                 discount_percentage=repair_price.discount_percentage,
                 discount_amount=repair_price.discount_amount,
-                final_price=repair_price.final_price,
+                final_price=round_money(repair_price.final_price),
                 warranty_days=repair_price.warranty_days
-            )
+            ))
 
-        # Calculate totals
-        order.calculate_totals()
+        # Calculate totals from the in-memory items and insert the order with them
+        order.apply_totals(
+            sum(item.base_price for item in order_items),
+            sum(item.item_discount for item in order_items)
+        )
         order.save()
+        OrderItem.objects.bulk_create(order_items, batch_size=100)
+        # Serve order_items from the objects just created (problems already
+        # loaded) instead of fetching them back
+        order._prefetched_objects_cache = {'order_items': order_items}
 
         # Return order details
         output_serializer = OrderSerializer(order)
         return Response(output_serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def confirm(self, request, pk=None):
         """Confirm an order (admin only in production)"""
         order = self.get_object()
@@ -349,10 +481,11 @@ class OrderViewSet(viewsets.ModelViewSet):
         order.confirmed_at = timezone.now()
         order.save()
 
-        # Set warranty expiry for all items
-        for item in order.order_items.all():
+        # Set warranty expiry for all items (already prefetched by get_queryset)
+        items = list(order.order_items.all())
+        for item in items:
             item.set_warranty_expiry()
-            item.save()
+        OrderItem.objects.bulk_update(items, ['warranty_expires_at'], batch_size=200)
 
         serializer = self.get_serializer(order)
         return Response(serializer.data)